@@ -1,5 +1,10 @@
 import time
 import logging
+from collections import deque
+
+def _estimate_size(msg_dict):
+    """Cheap byte-size estimate of a message dict (repr length, single C pass)."""
+    return len(str(msg_dict))
 
 class BufferManager:
     """
@@ -7,7 +12,7 @@ class BufferManager:
     Assumes messages are pre-cleaned (e.g., NaN replaced with None).
     """
 
-    def __init__(self, buffer_size=50, flush_timeout=2.0, logger=None):
+    def __init__(self, buffer_size=50, flush_timeout=2.0, logger=None, flush_cb=None, flush_watermark=0.8, min_flush_interval=0.25, bytes_watermark=32768):
         """
         Initializes the message buffer.
 
@@ -15,53 +20,105 @@ class BufferManager:
             buffer_size (int): Max number of messages before indicating buffer is full.
             flush_timeout (float): Seconds of inactivity before indicating timeout.
             logger (logging.Logger): Logger instance.
+            flush_cb (callable, optional): Called with this BufferManager when the
+                buffer should be flushed, instead of signalling via return value.
+            flush_watermark (float): Fraction of buffer_size at which an early
+                flush may fire during bursts, overlapping the send with ingest.
+            min_flush_interval (float): Minimum seconds between watermark flushes.
+            bytes_watermark (int): Approximate payload bytes that also trigger a
+                flush, so a few large messages do not wait for the count limit.
         """
         self.buffer_size = buffer_size
         self.flush_timeout = flush_timeout
-        self.buffer = [] # Holds pre-cleaned message dictionaries
-        self.last_msg_time = time.time()
+        self.buffer = deque(maxlen=buffer_size) # Holds pre-cleaned message dictionaries; evicts oldest in O(1)
+        self._len = 0 # Mirrors len(self.buffer) so hot checks skip the container slot lookup
+        self.last_msg_time = time.monotonic()
+        self.last_flush_time = self.last_msg_time
+        self.flush_cb = flush_cb
+        self._watermark_count = max(1, int(buffer_size * flush_watermark))
+        self._min_flush_interval = min_flush_interval
+        self.bytes_watermark = bytes_watermark
+        self.buffer_bytes = 0 # Rough accumulated payload size of the current batch
+        self._spare = None # Recycled deque reused by swap_out to avoid reallocation
         self.logger = logger or logging.getLogger(__name__)
+        self._debug_enabled = self.logger.isEnabledFor(logging.DEBUG)
         self.logger.info(f"BufferManager initialized: size={buffer_size}, timeout={flush_timeout}s")
 
-    def add_message(self, msg_dict):
+    def add_message(self, msg_dict, now=None):
         """
         Adds a pre-cleaned MAVLink message dictionary to the buffer.
 
         Args:
             msg_dict (dict): The pre-cleaned MAVLink message dictionary.
+            now (float, optional): Caller-provided time.monotonic() sample,
+                so a hot loop can sample the clock once per iteration.
 
         Returns:
             bool: True if the buffer reached capacity after adding, False otherwise.
         """
-        try:
-            self.buffer.append(msg_dict)
-            self.last_msg_time = time.time()
-            if len(self.buffer) > self.buffer_size:
-                self.buffer.pop(0)  # Remove the oldest message if buffer exceeds size
-            
-            self.logger.debug(f"Buffer size: {len(self.buffer)}/{self.buffer_size}") # Removed DEBUG log
-            return len(self.buffer) >= self.buffer_size
-        except Exception as e:
-            # Removed print statement
-            self.logger.error(f"BufferManager error adding message dict: {str(e)}", exc_info=True)
+        # No try/except here: nothing in this body should raise, and the main
+        # loop already logs unexpected exceptions with exc_info=True.
+        if now is None: now = time.monotonic()
+        self.buffer.append(msg_dict)
+        self.last_msg_time = now
+        self.buffer_bytes += _estimate_size(msg_dict)
+
+        count = len(self.buffer)
+        self._len = count
+        if self._debug_enabled:
+            self.logger.debug("Buffer size: %d/%d (~%d bytes)", count, self.buffer_size, self.buffer_bytes)
+        full = count >= self.buffer_size or self.buffer_bytes >= self.bytes_watermark
+        if self.flush_cb is not None:
+            if full or (count >= self._watermark_count and
+                        now - self.last_flush_time > self._min_flush_interval):
+                self.flush_cb(self)
             return False
+        return full
 
-    def check_timeout(self):
+    def check_timeout(self, now=None):
         """Checks if the inactivity timeout has been reached while buffer has messages."""
-        is_timed_out = (time.time() - self.last_msg_time) > self.flush_timeout
-        has_messages = bool(self.buffer)
-        return is_timed_out and has_messages
+        if not self._len: return False # Common case: nothing buffered, skip the clock read
+        if now is None: now = time.monotonic()
+        return (now - self.last_msg_time) > self.flush_timeout
+
+    def swap_out(self):
+        """
+        Atomically replaces the internal deque with a fresh empty one and
+        returns the old deque, so the caller can serialize it while the
+        producer keeps appending to the new buffer.
+        """
+        old = self.buffer
+        spare = self._spare
+        if spare is not None:
+            self._spare = None
+            self.buffer = spare
+        else:
+            self.buffer = deque(maxlen=self.buffer_size)
+        self._len = 0
+        self.buffer_bytes = 0
+        self.last_msg_time = time.monotonic()
+        self.last_flush_time = self.last_msg_time
+        return old
+
+    def recycle(self, old):
+        """Returns a deque handed out by swap_out to the spare slot for reuse."""
+        old.clear()
+        if self._spare is None:
+            self._spare = old
 
     def clear_buffer(self):
         """Clears the message buffer and resets the last message timestamp."""
         self.buffer.clear()
-        self.last_msg_time = time.time()
+        self._len = 0
+        self.buffer_bytes = 0
+        self.last_msg_time = time.monotonic()
+        self.last_flush_time = self.last_msg_time
         # self.logger.debug("Buffer cleared") # Removed DEBUG log
 
     def get_buffer_content(self):
-        """Returns the current list of buffered message dictionaries."""
-        return self.buffer
+        """Returns the current buffered message dictionaries as a list."""
+        return list(self.buffer)
 
     def is_empty(self):
         """Checks if the buffer is currently empty."""
-        return not self.buffer
+        return not self._len
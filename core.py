@@ -1,41 +1,64 @@
 import argparse
 import time
 import sys
+import threading
 import logging
+import logging.handlers
 import os
 import queue
 import uuid
 import importlib
+import functools
 import json
 from typing import Dict, Optional, List, Any
 
-# Proje modüllerini import et
-from buffer_manager import BufferManager
-from mavlink_handler.mavlink_handler_copter import MAVLinkHandlerCopter
-from socketio_connection import SocketIOConnection
+try:
+    import orjson # Yapılandırma ve rapor serileştirmede stdlib json'dan ~5x hızlı
+except ImportError:
+    orjson = None
+
+# Proje modülleri (pymavlink/socketio zinciriyle) ağırdır; --help ve
+# yapılandırma hataları bu maliyeti ödemesin diye main() içinde import edilir.
 
 # --- Global Değişkenler ---
-mav_copter: Optional[MAVLinkHandlerCopter] = None
-socket_client: Optional[SocketIOConnection] = None
-buffer: Optional[BufferManager] = None
+mav_copter: Optional["MAVLinkHandlerCopter"] = None
+socket_client: Optional["SocketIOConnection"] = None
+buffer: Optional["BufferManager"] = None
 logger: Optional[logging.Logger] = None
+log_listener: Optional[logging.handlers.QueueListener] = None
 OPERATION_MAP: Dict[str, str] = {}
+OPERATION_CLASSES: Dict[str, type] = {}
 
 
 active_operations: Dict[str, Any] = {}
 operation_output_queue = queue.Queue()
 
+# MAVLink alan adları (lat, lon, time_boot_ms, ...) her mesajta tekrarlanır;
+# tek bir havuzdan paylaştırılırsa dict anahtarları aynı string nesnesini kullanır.
+_KEY_CACHE: Dict[str, str] = {}
+
 # -----------------------------
 
+def _intern_message_keys(msg: Dict[str, Any]) -> Dict[str, Any]:
+    """Mesaj sözlüğünün anahtarlarını ortak havuzdaki string nesneleriyle değiştirir."""
+    cache = _KEY_CACHE
+    return {cache.setdefault(k, k): v for k, v in msg.items()}
+
 def setup_logging(log_level_str="INFO", log_file="mavlink_bridge.log"):
-    """Dosya ve konsol için loglama ayarlarını yapar."""
-    
+    """Dosya ve konsol için loglama ayarlarını yapar.
+
+    Gerçek I/O bir QueueListener thread'ine taşınır; üretici thread'ler
+    yalnızca kuyruğa kayıt bırakır ve diskte asla bloklanmaz.
+    """
+    global log_listener
+
     log_level = getattr(logging, log_level_str.upper(), logging.INFO)
     log_formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)-8s - %(message)s')
     log_dir = os.path.dirname(log_file)
     
-    if log_dir and not os.path.exists(log_dir):
-        try: os.makedirs(log_dir)
+    if log_dir:
+        # exist_ok=True: tek syscall, exists+makedirs TOCTOU yarışı yok
+        try: os.makedirs(log_dir, exist_ok=True)
         except OSError as e:
             print(f"KRİTİK: Log dizini oluşturulamadı {log_dir}: {e}.", file=sys.stderr)
             log_file = os.path.basename(log_file)
@@ -43,23 +66,37 @@ def setup_logging(log_level_str="INFO", log_file="mavlink_bridge.log"):
     log_handler = logging.FileHandler(log_file, mode='a')
     log_handler.setFormatter(log_formatter)
     root_logger = logging.getLogger()
-    
+
     if root_logger.hasHandlers(): root_logger.handlers.clear()
-    
-    root_logger.setLevel(log_level)
-    root_logger.addHandler(log_handler)
-    
+
     console_handler = logging.StreamHandler(sys.stdout)
     console_handler.setFormatter(log_formatter)
     console_handler.setLevel(logging.INFO)
-    
-    root_logger.addHandler(console_handler)
-    
+
+    log_queue = queue.Queue(-1)
+    log_listener = logging.handlers.QueueListener(
+        log_queue, log_handler, console_handler, respect_handler_level=True)
+    log_listener.start()
+
+    root_logger.setLevel(log_level)
+    root_logger.addHandler(logging.handlers.QueueHandler(log_queue))
+
     logger_instance = logging.getLogger(__name__)
     logger_instance.info(f"Loglama ayarlandı. Seviye: {log_level_str}, Dosya: '{log_file}'")
-    
+
     return logger_instance
 
+def stop_logging():
+    """Kuyrukta bekleyen log kayıtlarını diske boşaltıp dinleyiciyi durdurur.
+
+    Her çıkış yolundan (başarılı ya da hatalı) önce çağrılmalıdır; aksi halde
+    son kritik kayıtlar daemon dinleyici thread'i ile birlikte kaybolabilir.
+    """
+    global log_listener
+    if log_listener:
+        log_listener.stop()
+        log_listener = None
+
 def parse_args():
     """Komut satırı argümanlarını ayrıştırır."""
     parser = argparse.ArgumentParser(description='MAVLink to WebSocket Bridge')
@@ -76,24 +113,29 @@ def parse_args():
     parser.add_argument('--log-level', default='INFO', choices=['DEBUG', 'INFO', 'WARNING', 'ERROR', 'CRITICAL'], help='Dosya için loglama seviyesi')
     parser.add_argument('--socket-check-interval', default=5.0, type=float, help='Socket.IO bağlantı kontrol aralığı (s)')
     parser.add_argument('--socket-max-disconnect', default=30.0, type=float, help='Çıkış öncesi maks. Socket.IO kopukluk süresi (s)')
-    parser.add_argument('--loop-sleep', default=0.01, type=float, help='Ana döngü bekleme süresi (s)')
+    parser.add_argument('--loop-sleep', default=0.01, type=float, help='Ana döngü için minimum bekleme süresi (s)')
     parser.add_argument('--op-config', default='config/operations.json', help='Operasyon yapılandırma dosyasının yolu')
+    parser.add_argument('--cv-threads', default=0, type=int, help='OpenCV/BLAS iş parçacığı sayısı (0 = çekirdek sayısının yarısı)')
     
     return parser.parse_args()
 
 def load_operations_config(filepath: str) -> Optional[Dict[str, str]]:
     """Operasyon yapılandırma dosyasını (JSON) okur ve bir sözlük döndürür."""
     try:
-        with open(filepath, 'r') as f:
-            config_data = json.load(f)
+        if orjson is not None:
+            with open(filepath, 'rb') as f:
+                config_data = orjson.loads(f.read())
+        else:
+            with open(filepath, 'r') as f:
+                config_data = json.load(f)
         logger.info(f"{len(config_data)} adet operasyon '{filepath}' dosyasından başarıyla yüklendi.")
         return config_data
-    
+
     except FileNotFoundError:
         logger.error(f"Operasyon yapılandırma dosyası bulunamadı: {filepath}")
         return None
-    
-    except json.JSONDecodeError as e:
+
+    except (json.JSONDecodeError, ValueError) as e:
         logger.error(f"Operasyon yapılandırma dosyası hatalı (JSON formatında değil): {filepath}. Hata: {e}")
         return None
     
@@ -101,17 +143,91 @@ def load_operations_config(filepath: str) -> Optional[Dict[str, str]]:
         logger.error(f"Operasyon yapılandırma dosyası okunurken beklenmedik bir hata oluştu: {e}")
         return None
 
+@functools.lru_cache(maxsize=128)
+def _resolve_class(class_path: str) -> type:
+    """class_path'i modül+sınıfa çözer; sonuç lru_cache ile önbellekte kalır."""
+    module_path, class_name = class_path.rsplit('.', 1)
+    module = sys.modules.get(module_path) or importlib.import_module(module_path)
+    return getattr(module, class_name)
+
 def get_operation_class(class_path: str) -> Optional[type]:
     """Verilen yolu kullanarak bir sınıfı dinamik olarak import eder."""
     try:
-        module_path, class_name = class_path.rsplit('.', 1)
-        module = importlib.import_module(module_path)
-        return getattr(module, class_name)
-    
+        return _resolve_class(class_path)
+
     except (ImportError, AttributeError) as e:
         logger.error(f"Operasyon sınıfı yüklenemedi: {class_path}. Hata: {e}")
         return None
 
+def resolve_operation_classes(op_map: Dict[str, str]) -> Dict[str, type]:
+    """Yapılandırmadaki tüm operasyon sınıflarını başlangıçta bir kez çözümler.
+
+    Hatalı girdiler istek anında değil açılışta loglanır ve haritadan düşer;
+    istek işleyici böylece her çağrıda importlib'e gitmez.
+    """
+    resolved = {}
+    for op_name, class_path in op_map.items():
+        OperationClass = get_operation_class(class_path)
+        if OperationClass is None:
+            logger.warning(f"'{op_name}' operasyonu devre dışı bırakıldı (sınıf çözümlenemedi: {class_path}).")
+            continue
+        resolved[op_name] = OperationClass
+    return resolved
+
+# is_ready() bağlantı durumunu sorgulayabilir; art arda gelen operasyon
+# isteklerinde aynı sonucu kısa bir TTL ile önbellekten döndür.
+_MAV_READY_TTL = 1.0
+_mav_ready_cache = (-_MAV_READY_TTL, False)
+
+def _mav_is_ready() -> bool:
+    """MAVLink hazır mı? Sonucu _MAV_READY_TTL saniye boyunca önbelleğe alır."""
+    global _mav_ready_cache
+    now = time.monotonic()
+    ts, value = _mav_ready_cache
+    if now - ts < _MAV_READY_TTL:
+        return value
+    value = bool(mav_copter and mav_copter.is_ready())
+    _mav_ready_cache = (now, value)
+    return value
+
+class StatusBatcher(threading.Thread):
+    """Operasyon durum raporlarını kısa bir pencerede toplayıp tek emit ile gönderir.
+
+    Ana döngünün kuyruğu tek tek boşaltıp her rapor için ayrı bir ağ yazması
+    yapması yerine, raporlar batch_size'a ulaşınca veya flush_window dolunca
+    'status_operation_batch' olayıyla liste halinde gider.
+    """
+
+    def __init__(self, source_queue: queue.Queue, socket_client, batch_size: int = 32, flush_window: float = 0.02):
+        super().__init__(daemon=True, name="StatusBatcher")
+        self.source_queue = source_queue
+        self.socket_client = socket_client
+        self.batch_size = batch_size
+        self.flush_window = flush_window
+        self._stop_event = threading.Event()
+
+    def run(self):
+        items = []
+        while not self._stop_event.is_set():
+            # Elimizde rapor varken kısa pencere, boştayken uzun bekleme
+            timeout = self.flush_window if items else 0.5
+            try:
+                items.append(self.source_queue.get(timeout=timeout))
+                if len(items) < self.batch_size:
+                    continue
+            except queue.Empty:
+                if not items:
+                    continue
+            self.socket_client.emit_status('status_operation_batch', {'items': items})
+            items = []
+
+        if items:
+            self.socket_client.emit_status('status_operation_batch', {'items': items})
+
+    def stop(self):
+        self._stop_event.set()
+        self.join(timeout=2.0)
+
 def handle_start_operation(data: Dict[str, Any]) -> Dict[str, Any]:
     """Socket.IO'dan gelen operasyon başlatma isteğini dinamik olarak işler."""
     
@@ -120,16 +236,12 @@ def handle_start_operation(data: Dict[str, Any]) -> Dict[str, Any]:
     op_id = data.get("id", "None")
     logger.info(f"'{op_name}' operasyonunu başlatma isteği alındı (ID: {op_id}).")
     
-    class_path = OPERATION_MAP.get(op_name)
-    if not class_path:
+    OperationClass = OPERATION_CLASSES.get(op_name)
+    if OperationClass is None:
         logger.warning(f"Bilinmeyen operasyon isteği: {op_name}. Yapılandırma dosyasını kontrol edin.")
         return {'success': False, 'id': op_id, 'error': f'Unknown operation: {op_name}'}
-    
-    OperationClass = get_operation_class(class_path)
-    if not OperationClass:
-        return {'success': False, 'id': op_id, 'error': f'Operation class not found at {class_path}'}
-    
-    if not mav_copter or not mav_copter.is_ready():
+
+    if not _mav_is_ready():
         return {'success': False, 'id': op_id, 'error': 'MAVLink connection not available.'}
     
     try:
@@ -174,23 +286,50 @@ def handle_mavlink_mission_upload(items: List[Dict[str, Any]]) -> bool:
     return False
 
 # --- Ana Program ---
-def main():
-    """Uygulamayı başlatır ve ana döngüyü çalıştırır."""
-    global mav_copter, socket_client, buffer, logger, OPERATION_MAP
-    
+def main(enable_operations: bool = True):
+    """Uygulamayı başlatır ve ana döngüyü çalıştırır.
+
+    Args:
+        enable_operations: False verilirse operasyon alt sistemi (yapılandırma,
+            start/stop handler'ları ve çıktı kuyruğu) tamamen devre dışı kalır.
+    """
+    global mav_copter, socket_client, buffer, logger, OPERATION_MAP, OPERATION_CLASSES
+
     args = parse_args()
     logger = setup_logging(log_level_str=args.log_level, log_file=args.log_file)
     logger.info("--- MAVLink Köprüsü Başlatılıyor ---")
-    
-    OPERATION_MAP = load_operations_config(args.op_config)
-    if OPERATION_MAP is None:
-        logger.critical("Operasyonlar yüklenemedi. Çıkılıyor.")
-        sys.exit(1)
-    
+
+    # Görüntü işleme için iş parçacığı sayısını sabitle: 4 çekirdekli bir Pi'de
+    # OpenCV'nin nproc kadar worker açması MAVLink/Socket.IO thread'leriyle
+    # çekişir. Env değişkenleri numpy/cv2 import edilmeden önce ayarlanmalı.
+    cv_threads = args.cv_threads if args.cv_threads > 0 else max(1, (os.cpu_count() or 2) // 2)
+    for var in ('OMP_NUM_THREADS', 'OPENBLAS_NUM_THREADS', 'MKL_NUM_THREADS'):
+        os.environ.setdefault(var, str(cv_threads))
+
+    # Ağır bağımlılıklar ancak argümanlar geçerliyse yüklenir
+    from buffer_manager import BufferManager
+    from mavlink_handler.mavlink_handler_copter import MAVLinkHandlerCopter
+    from socketio_connection import SocketIOConnection
+
+    if enable_operations:
+        OPERATION_MAP = load_operations_config(args.op_config)
+        if OPERATION_MAP is None:
+            logger.critical("Operasyonlar yüklenemedi. Çıkılıyor.")
+            stop_logging()
+            sys.exit(1)
+        OPERATION_CLASSES = resolve_operation_classes(OPERATION_MAP)
+
+        # cv2 bir operasyon tarafından yüklendiyse thread sayısını orada da uygula
+        cv2_module = sys.modules.get('cv2')
+        if cv2_module is not None:
+            cv2_module.setNumThreads(cv_threads)
+            logger.info(f"OpenCV iş parçacığı sayısı {cv_threads} olarak sabitlendi.")
+
     logger.debug(f"Argümanlar: {vars(args)}")
     
     SERVER_URL = f'{args.srv_ptc}://{args.srv_host}:{args.srv_port}?user={args.srv_token}'
-    
+    status_batcher: Optional[StatusBatcher] = None
+
     try:
         logger.info("MAVLink bağlantısı başlatılıyor...")
         mav_copter = MAVLinkHandlerCopter(args.mv_url, source_system=args.mv_source_system, logger=logger)
@@ -201,8 +340,8 @@ def main():
             handler_command=handle_mavlink_command,
             handler_mission_download=handle_mavlink_mission_download,
             handler_mission_upload=handle_mavlink_mission_upload,
-            handler_start_operation=handle_start_operation,
-            handler_stop_operation=handle_stop_operation,
+            handler_start_operation=handle_start_operation if enable_operations else None,
+            handler_stop_operation=handle_stop_operation if enable_operations else None,
             logger=logger,
             check_interval=args.socket_check_interval,
             max_disconnect_time=args.socket_max_disconnect
@@ -210,56 +349,88 @@ def main():
         if not socket_client.connect():
             logger.critical("Socket.IO bağlantısı kurulamadı. Çıkılıyor.")
             if mav_copter: mav_copter.close()
+            stop_logging()
             sys.exit(1)
         
         logger.info("Buffer Yöneticisi başlatılıyor...")
-        buffer = BufferManager(buffer_size=args.buffer_size, flush_timeout=args.flush_timeout, logger=logger)
+        buffer = BufferManager(buffer_size=args.buffer_size, flush_timeout=args.flush_timeout,
+                               logger=logger, flush_cb=socket_client.flush_buffer)
+
+        if enable_operations:
+            status_batcher = StatusBatcher(operation_output_queue, socket_client)
+            status_batcher.start()
     
     except Exception as e:
         logger.critical(f"Başlatma sırasında kritik hata: {e}", exc_info=True)
         if socket_client: socket_client.disconnect()
         if mav_copter: mav_copter.close()
+        stop_logging()
         sys.exit(1)
     
     logger.info("--- Ana uygulama döngüsü başlatıldı ---")
+
+    # Sıcak döngüdeki global/attribute erişimlerini yerel isimlere indir:
+    # LOAD_GLOBAL dict aramaları yerine LOAD_FAST kullanılır.
+    _mav = mav_copter
+    _buf = buffer
+    _sock = socket_client
+    _log = logger
+    _monotonic = time.monotonic
+    _sleep = time.sleep
+    _QueueEmpty = queue.Empty
+    _loop_sleep = args.loop_sleep
+    _check_interval = args.socket_check_interval
+    _mav_queue_get = _mav.received_messages.get if _mav else None
+
     while True:
         try:
-            if mav_copter and mav_copter.connection_failed_permanently: break
-            if mav_copter:
+            now = _monotonic()
+            if _mav and _mav.connection_failed_permanently: break
+
+            # Bir sonraki flush'a kalan süre kadar kuyrukta uyu: mesaj gelince
+            # hemen uyanır, gelmezse tam flush zamanında Empty ile döner.
+            if _buf and not _buf.is_empty():
+                wait_timeout = max(_buf.flush_timeout - (now - _buf.last_msg_time), _loop_sleep)
+            else:
+                wait_timeout = min(_buf.flush_timeout if _buf else 1.0, _check_interval)
+
+            if _mav:
                 try:
-                    msg = mav_copter.received_messages.get_nowait()
-                    if msg and buffer.add_message(msg):
-                        if socket_client: socket_client.flush_buffer(buffer)
-                
-                except queue.Empty: pass
-            
-            if buffer and buffer.check_timeout():
-                if socket_client: socket_client.flush_buffer(buffer)
-            
-            try:
-                status_op = operation_output_queue.get_nowait()
-                if socket_client: socket_client.emit_status('status_operation', status_op)
-            
-            except queue.Empty: pass
-            if not socket_client.check_persistent_disconnect(): break
-            time.sleep(args.loop_sleep)
-        
+                    msg = _mav_queue_get(timeout=wait_timeout)
+                    now = _monotonic()
+                    if msg: _buf.add_message(_intern_message_keys(msg), now=now) # Doluluk flush'ı flush_cb üzerinden tetiklenir
+
+                except _QueueEmpty: now = _monotonic()
+
+            else:
+                _sleep(wait_timeout)
+                now = _monotonic()
+
+            if _buf and _buf.check_timeout(now=now):
+                if _sock: _sock.flush_buffer(_buf)
+
+            if not _sock.check_persistent_disconnect(): break
+
         except KeyboardInterrupt:
-            logger.info("Kullanıcı tarafından durduruldu (KeyboardInterrupt). Çıkılıyor...")
+            _log.info("Kullanıcı tarafından durduruldu (KeyboardInterrupt). Çıkılıyor...")
             break
-        
+
         except Exception as e:
-            logger.error(f"Ana döngüde beklenmedik hata: {e}", exc_info=True)
-            time.sleep(1)
+            _log.error(f"Ana döngüde beklenmedik hata: {e}", exc_info=True)
+            _sleep(1)
     
     logger.info("Kapanış prosedürü başlatılıyor...")
-    for op_id, op_instance in list(active_operations.items()):
+    if enable_operations and status_batcher:
+        status_batcher.stop() # Bekleyen raporları gönderip thread'i kapat
+    while active_operations:
+        op_id, op_instance = active_operations.popitem()
         logger.info(f"Çalışan operasyon durduruluyor: {op_id}")
         op_instance.stop()
     
     if socket_client: socket_client.disconnect()
     if mav_copter: mav_copter.close()
     logger.info("--- MAVLink Köprüsü Durduruldu ---")
+    stop_logging() # Kuyruktaki kayıtları diske boşalt
     sys.exit(0)
 
 if __name__ == "__main__":
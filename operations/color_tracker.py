@@ -7,163 +7,404 @@ import numpy as np
 import math
 import time
 import uuid
+import itertools
 import logging
+from collections import deque
 from queue import Queue
 from typing import Dict, Any, Optional
 
-# --- Hedef Yönetim Sınıfları (operation_01.py'den uyarlandı) ---
+# Modül düzeyinde bağlanmış saat: sıcak yolda time.time attribute araması yapılmaz
+_time = time.time
+
+try:
+    from numba import njit # Skaler GPS çekirdeğini makine koduna derler (opsiyonel)
+except ImportError:
+    njit = None
 
-class Target:
-    """Tek bir hedefi temsil eden sınıf."""
-    def __init__(self, pixel_coords: tuple, gps_coords: tuple, confirmation_frames: int):
-        self.id = uuid.uuid4()
-        self.last_pixel_coords = pixel_coords
-        self.gps_coords = gps_coords
-        self.confirmation_counter = 1
-        self.frames_unseen = 0
-        self.is_reported = False
-        self._confirmation_frames = confirmation_frames
-
-    def update(self, pixel_coords: tuple, gps_coords: tuple):
-        """Hedefin bilgilerini günceller."""
-        self.last_pixel_coords = pixel_coords
-        self.gps_coords = gps_coords
-        self.frames_unseen = 0
-        if self.confirmation_counter <= self._confirmation_frames:
-            self.confirmation_counter += 1
+# --- Hedef Yönetim Sınıfları (operation_01.py'den uyarlandı) ---
 
 class TargetManager:
-    """Tespit edilen tüm hedefleri yöneten, güncelleyen ve raporlayan sınıf."""
+    """Tespit edilen tüm hedefleri yöneten, güncelleyen ve raporlayan sınıf.
+
+    Hedefler nesne listesi yerine SoA (Struct-of-Arrays) düzeninde, paralel
+    NumPy dizilerinde tutulur: mesafe taraması ve sayaç güncellemeleri böylece
+    Python döngüsü yerine C hızında vektörel çalışır.
+    """
+    _INITIAL_CAPACITY = 16
+    # Geçici hedefler için süreç-yerel artan sayaç; uuid4'ün os.urandom
+    # syscall'ı yalnızca doğrulanıp raporlanan hedefler için ödenir.
+    _id_counter = itertools.count()
+
     def __init__(self, output_queue: Queue, config: Dict[str, Any]):
-        self.targets = []
         self.output_queue = output_queue
         self.config = config
+        self._capacity = self._INITIAL_CAPACITY
+        self._count = 0
+        self._px = np.zeros((self._capacity, 2), dtype=np.float32)  # son piksel koordinatları
+        self._gps = np.zeros((self._capacity, 2), dtype=np.float64) # enlem/boylam
+        self._confirm = np.zeros(self._capacity, dtype=np.int32)    # doğrulama sayaçları
+        self._unseen = np.zeros(self._capacity, dtype=np.int32)     # görülmeyen kare sayaçları
+        self._reported = np.zeros(self._capacity, dtype=bool)
+        self._ids: list = []                                        # satır -> hedef kimliği
+        self._pxthr_sq = float(config['pixel_threshold']) ** 2      # kare mesafe eşiği (sqrt'tan kaçınmak için)
 
-    def find_closest_target(self, pixel_coords: tuple) -> Optional[Target]:
-        """Verilen piksel koordinatlarına eşik mesafesi içindeki en yakın hedefi bulur."""
-        closest_target = None
-        min_dist = float('inf')
-        for target in self.targets:
-            dist = math.hypot(pixel_coords[0] - target.last_pixel_coords[0], 
-                              pixel_coords[1] - target.last_pixel_coords[1])
-            if dist < self.config['pixel_threshold'] and dist < min_dist:
-                min_dist = dist
-                closest_target = target
-        return closest_target
-
-    def update(self, new_detections: list, mav_telemetry: Dict[str, Any], frame_shape: tuple):
-        """Yeni tespitlerle hedef listesini günceller ve raporlanması gerekenleri kuyruğa ekler."""
-        updated_targets_in_frame = set()
-        
-        for pixel in new_detections:
-            gps = calculate_target_gps(frame_shape, pixel, mav_telemetry, self.config)
-            if not gps: 
-                continue
+    def __len__(self):
+        return self._count
 
-            closest = self.find_closest_target(pixel)
-            if closest:
-                closest.update(pixel, gps)
-                updated_targets_in_frame.add(closest.id)
-            else:
-                self.targets.append(Target(pixel, gps, self.config['confirmation_frames']))
-
-        for target in self.targets:
-            if target.id not in updated_targets_in_frame:
-                target.frames_unseen += 1
-            
-            if not target.is_reported and target.confirmation_counter >= self.config['confirmation_frames']:
-                lat, lon = target.gps_coords
-                report = {
-                    "type": "target_detected",
-                    "operation_type": "color_tracker",
-                    "id": str(target.id),
-                    "lat": lat,
-                    "lon": lon,
-                    "timestamp": time.time()
-                }
-                self.output_queue.put(report)
-                target.is_reported = True
-        
-        self.targets = [t for t in self.targets if t.frames_unseen < self.config['unseen_threshold']]
+    def _grow(self):
+        """Dizileri iki katına çıkarır (amortize O(1) ekleme)."""
+        new_capacity = self._capacity * 2
+        for name in ('_px', '_gps', '_confirm', '_unseen', '_reported'):
+            old = getattr(self, name)
+            new = np.zeros((new_capacity,) + old.shape[1:], dtype=old.dtype)
+            new[:self._count] = old[:self._count]
+            setattr(self, name, new)
+        self._capacity = new_capacity
+
+    def _append(self, pixel_coords, gps_coords):
+        """Yeni bir hedef satırı ekler ve indeksini döndürür."""
+        if self._count == self._capacity:
+            self._grow()
+        i = self._count
+        self._px[i] = pixel_coords
+        self._gps[i] = gps_coords
+        self._confirm[i] = 1
+        self._unseen[i] = 0
+        self._reported[i] = False
+        self._ids.append(next(self._id_counter))
+        self._count += 1
+        return i
+
+    def find_closest_target(self, pixel_coords) -> int:
+        """Eşik mesafesi içindeki en yakın hedefin satır indeksini döndürür (yoksa -1)."""
+        n = self._count
+        if n == 0: return -1
+        px = self._px[:n]
+        dx = px[:, 0] - pixel_coords[0]
+        dy = px[:, 1] - pixel_coords[1]
+        # Sadece sıralama önemli: kare mesafeler sqrt olmadan karşılaştırılır
+        dists_sq = dx * dx + dy * dy
+        i = int(dists_sq.argmin())
+        return i if dists_sq[i] < self._pxthr_sq else -1
+
+    def update(self, new_detections, mav_telemetry: Dict[str, Any], frame_shape: tuple):
+        """Yeni tespitlerle hedef dizilerini günceller ve raporlanması gerekenleri kuyruğa ekler."""
+        updated_rows = set()
+        confirmation_frames = self.config['confirmation_frames']
+
+        # Piksel uzayı float32'de kalır: eşleştirme matrisinin bant genişliği
+        # yarıya iner, hassasiyet piksel ölçeğinde fazlasıyla yeterlidir
+        detections = np.asarray(new_detections, dtype=np.float32).reshape(-1, 2)
+        if len(detections) > 0:
+            # Tüm tespitlerin GPS'i tek vektörel çağrıda; geçersiz satırlar NaN
+            gps_all = calculate_target_gps_batch(frame_shape, detections, mav_telemetry, self.config)
+
+            # Açgözlü toplu eşleştirme: (M,N) kare mesafe matrisi bir kez
+            # kurulur, her turda global en yakın (tespit, hedef) çifti
+            # eşlenir ve ilgili satır/sütun devre dışı bırakılır. Böylece
+            # her hedef karede en fazla bir tespit alır; tespit başına ayrı
+            # find_closest_target taraması yapılmaz.
+            valid = ~np.isnan(gps_all[:, 0])
+            matched = np.zeros(len(detections), dtype=bool)
+            n_existing = self._count
+            if n_existing > 0 and valid.any():
+                diff = detections[:, None, :] - self._px[:n_existing][None, :, :]
+                dist_sq = np.einsum('mnd,mnd->mn', diff, diff)
+                dist_sq[~valid, :] = np.inf
+                dist_sq[dist_sq >= self._pxthr_sq] = np.inf
+                while True:
+                    flat = int(dist_sq.argmin())
+                    j, i = divmod(flat, n_existing)
+                    if not np.isfinite(dist_sq[j, i]):
+                        break
+                    self._px[i] = detections[j]
+                    self._gps[i] = gps_all[j]
+                    self._unseen[i] = 0
+                    if self._confirm[i] <= confirmation_frames:
+                        self._confirm[i] += 1
+                    updated_rows.add(i)
+                    matched[j] = True
+                    dist_sq[j, :] = np.inf
+                    dist_sq[:, i] = np.inf
+
+            # Eşleşmeyen geçerli tespitler yeni hedef olarak eklenir
+            for j in np.nonzero(valid & ~matched)[0]:
+                self._append(detections[j], gps_all[j])
+
+        n = self._count
+        if n == 0: return
+
+        # Bu karede eşleşmeyen hedeflerin 'görülmedi' sayacını vektörel artır
+        missed = np.ones(n, dtype=bool)
+        if updated_rows:
+            missed[list(updated_rows)] = False
+        self._unseen[:n][missed] += 1
+
+        # Doğrulanan ve henüz raporlanmamış hedefleri kuyruğa yaz
+        to_report = np.nonzero(~self._reported[:n] & (self._confirm[:n] >= confirmation_frames))[0]
+        now = _time() if len(to_report) else 0.0 # Tek saat okuması tüm raporlara yeter
+        for i in to_report:
+            # Kalıcı UUID ancak hedef doğrulandığında üretilir
+            if isinstance(self._ids[i], int):
+                self._ids[i] = uuid.uuid4()
+            report = {
+                "type": "target_detected",
+                "operation_type": "color_tracker",
+                "id": str(self._ids[i]),
+                "lat": float(self._gps[i, 0]),
+                "lon": float(self._gps[i, 1]),
+                "timestamp": now
+            }
+            self.output_queue.put(report)
+            self._reported[i] = True
+
+        # Uzun süre görülmeyen hedefleri sıkıştırarak düş
+        keep = self._unseen[:n] < self.config['unseen_threshold']
+        if not keep.all():
+            kept = int(keep.sum())
+            for name in ('_px', '_gps', '_confirm', '_unseen', '_reported'):
+                arr = getattr(self, name)
+                arr[:kept] = arr[:n][keep]
+            # İki işaretçili sıkıştırma: yeni liste ayırmadan hayatta kalanları öne yaz
+            write = 0
+            ids = self._ids
+            for idx in range(n):
+                if keep[idx]:
+                    ids[write] = ids[idx]
+                    write += 1
+            del ids[write:]
+            self._count = kept
 
 
 # --- Görüntü İşleme ve Hesaplama Fonksiyonları (operation_01.py'den uyarlandı) ---
 
-def detect_all_color_targets(frame: np.ndarray, config: Dict[str, Any]) -> list:
-    """
-    Bir görüntüdeki hedefleri, Raspberry Pi için optimize edilmiş 
-    "Hibrit Filtreleme" yöntemiyle bulur.
+# Morfoloji çekirdeği her karede yeniden üretilmez; modül düzeyinde sabittir.
+_KERNEL = cv2.getStructuringElement(cv2.MORPH_RECT, (3, 3))
+
+try:
+    _HAVE_OPENCL = cv2.ocl.haveOpenCL()
+except Exception:
+    _HAVE_OPENCL = False
+
+def _split_hue_bounds(hsv_lower: np.ndarray, hsv_upper: np.ndarray) -> tuple:
+    """Ton bandını inRange aralıklarına çevirir.
+
+    OpenCV'de ton 0-179 arasında dairesel olduğundan, alt sınır üst sınırdan
+    büyükse (kırmızı tonları) band 0'ı sarar ve tek inRange yanlış sonuç verir.
+    Bu durumda band bir kez, başlangıçta iki aralığa bölünür; sıcak yol
+    maskeleri bitwise_or ile birleştirir.
     """
+    if hsv_lower[0] <= hsv_upper[0]:
+        return ((hsv_lower, hsv_upper),)
+    upper_wrap = np.ascontiguousarray([179, hsv_upper[1], hsv_upper[2]], dtype=np.uint8)
+    lower_wrap = np.ascontiguousarray([0, hsv_lower[1], hsv_lower[2]], dtype=np.uint8)
+    return ((hsv_lower, upper_wrap), (lower_wrap, hsv_upper))
+
+def _detect_impl(frame: np.ndarray, resize_width: int, top_n_contours: int, min_contour_area: float,
+                 solidity_thr: float, hsv_bounds: tuple,
+                 buffers: Dict[str, Any]) -> np.ndarray:
+    """Tespit boru hattının gövdesi; tüm parametreler yerel değişken olarak gelir."""
     original_height, original_width = frame.shape[:2]
-    if original_width == 0: return []
-    
-    scale_ratio = original_width / config['resize_width']
+    if original_width == 0: return np.empty((0, 2), np.float32)
+
+    scale_ratio = original_width / resize_width
     new_height = int(original_height / scale_ratio)
-    resized_image = cv2.resize(frame, (config['resize_width'], new_height), interpolation=cv2.INTER_LINEAR)
+    new_size = (resize_width, new_height)
+
+    if _HAVE_OPENCL and cv2.ocl.useOpenCL():
+        # T-API: boru hattı findContours'a kadar GPU üzerinde kalır
+        resized_u = cv2.resize(cv2.UMat(frame), new_size, interpolation=cv2.INTER_LINEAR)
+        hsv_u = cv2.cvtColor(resized_u, cv2.COLOR_BGR2HSV)
+        mask_u = cv2.inRange(hsv_u, hsv_bounds[0][0], hsv_bounds[0][1])
+        if len(hsv_bounds) > 1:
+            mask_u = cv2.bitwise_or(mask_u, cv2.inRange(hsv_u, hsv_bounds[1][0], hsv_bounds[1][1]))
+        mask_u = cv2.morphologyEx(mask_u, cv2.MORPH_OPEN, _KERNEL, iterations=1)
+        mask = mask_u.get()
+
+    else:
+        if buffers.get('size') != new_size:
+            buffers['size'] = new_size
+            buffers['resized'] = np.empty((new_height, new_size[0], 3), np.uint8)
+            buffers['hsv'] = np.empty_like(buffers['resized'])
+            buffers['mask'] = np.empty((new_height, new_size[0]), np.uint8)
+            buffers['mask2'] = np.empty_like(buffers['mask'])
 
-    hsv = cv2.cvtColor(resized_image, cv2.COLOR_BGR2HSV)
-    mask = cv2.inRange(hsv, config['hsv_lower'], config['hsv_upper'])
+        resized_image = cv2.resize(frame, new_size, dst=buffers['resized'], interpolation=cv2.INTER_LINEAR)
+        hsv = cv2.cvtColor(resized_image, cv2.COLOR_BGR2HSV, dst=buffers['hsv'])
+        mask = cv2.inRange(hsv, hsv_bounds[0][0], hsv_bounds[0][1], dst=buffers['mask'])
+        if len(hsv_bounds) > 1:
+            mask2 = cv2.inRange(hsv, hsv_bounds[1][0], hsv_bounds[1][1], dst=buffers['mask2'])
+            mask = cv2.bitwise_or(mask, mask2, dst=mask)
+        mask = cv2.morphologyEx(mask, cv2.MORPH_OPEN, _KERNEL, dst=mask, iterations=1)
 
-    kernel = np.ones((3, 3), np.uint8)
-    mask = cv2.morphologyEx(mask, cv2.MORPH_OPEN, kernel, iterations=1)
+    # Boş/önemsiz maskede blob analizine hiç girme: countNonZero SIMD ile µs sürer
+    if cv2.countNonZero(mask) < min_contour_area:
+        return np.empty((0, 2), np.float32)
+
+    # Alan, sınır kutusu ve ağırlık merkezi tek SIMD geçişinde çıkar;
+    # findContours + boundingRect + contourArea'nın çoklu geçişleri yerine geçer.
+    num_labels, labels, stats, centroids = cv2.connectedComponentsWithStats(mask, connectivity=8)
 
-    contours, _ = cv2.findContours(mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
-    
     detected_centers = []
-    if len(contours) > 0:
-        sorted_contours = sorted(contours, key=cv2.contourArea, reverse=True)
-        
-        for contour in sorted_contours[:config['top_n_contours']]:
-            if cv2.contourArea(contour) < config['min_contour_area']:
+    if num_labels > 1:
+        areas = stats[1:, cv2.CC_STAT_AREA]
+        order = np.argsort(-areas)[:top_n_contours]
+
+        for idx in order:
+            if areas[idx] < min_contour_area:
                 break
 
+            label = idx + 1
+            x = stats[label, cv2.CC_STAT_LEFT]
+            y = stats[label, cv2.CC_STAT_TOP]
+            w = stats[label, cv2.CC_STAT_WIDTH]
+            h = stats[label, cv2.CC_STAT_HEIGHT]
+
+            # Solidity yalnızca hayatta kalan ≤top_n blob için, küçük ROI üzerinde
+            blob = (labels[y:y + h, x:x + w] == label).astype(np.uint8)
+            blob_contours, _ = cv2.findContours(blob, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+            if not blob_contours:
+                continue
+
+            contour = max(blob_contours, key=cv2.contourArea)
             hull = cv2.convexHull(contour)
-            if cv2.contourArea(hull) > 0:
-                solidity = float(cv2.contourArea(contour)) / cv2.contourArea(hull)
-                
+            hull_area = cv2.contourArea(hull)
+            if hull_area > 0:
+                solidity = float(cv2.contourArea(contour)) / hull_area
+
                 # YENİ: Solidity kontrolü artık yapılandırma dosyasından geliyor
-                if solidity > config['solidity']:
-                    x, y, w, h = cv2.boundingRect(contour)
-                    
-                    orig_cX = int((x + w / 2) * scale_ratio)
-                    orig_cY = int((y + h / 2) * scale_ratio)
-                    
-                    detected_centers.append((orig_cX, orig_cY))
-    
-    return detected_centers
-
-def calculate_target_gps(frame_shape: tuple, target_pixel: tuple, telemetry: Dict[str, Any], config: Dict[str, Any]) -> Optional[tuple]:
-    """Hedefin GPS koordinatlarını, dron telemetrisi ve kamera açısından yola çıkarak hesaplar."""
+                if solidity > solidity_thr:
+                    cX, cY = centroids[label]
+                    detected_centers.append((int(cX * scale_ratio), int(cY * scale_ratio)))
+
+    return np.asarray(detected_centers, dtype=np.float32).reshape(-1, 2)
+
+def _make_detector(config: Dict[str, Any], buffers: Dict[str, Any]):
+    """config sabitlerini closure yerellerine bağlayan özelleşmiş tespitçi üretir.
+
+    Operasyon boyunca değişmeyen parametreler start() anında bir kez okunur;
+    sıcak döngü kare başına dict araması yapmadan self._detect(frame) çağırır.
+    """
+    resize_width = config['resize_width']
+    top_n_contours = config['top_n_contours']
+    min_contour_area = config['min_contour_area']
+    solidity_thr = config['solidity']
+    hsv_bounds = _split_hue_bounds(config['hsv_lower'], config['hsv_upper'])
+
+    def detect(frame: np.ndarray) -> np.ndarray:
+        return _detect_impl(frame, resize_width, top_n_contours, min_contour_area,
+                            solidity_thr, hsv_bounds, buffers)
+
+    return detect
+
+def detect_all_color_targets(frame: np.ndarray, config: Dict[str, Any], buffers: Optional[Dict[str, Any]] = None) -> np.ndarray:
+    """
+    Bir görüntüdeki hedefleri, Raspberry Pi için optimize edilmiş
+    "Hibrit Filtreleme" yöntemiyle bulur. (N,2) piksel koordinat dizisi döndürür.
+
+    Args:
+        buffers: Çağrılar arasında yeniden kullanılacak ara görüntü tamponları.
+            Verilirse resize/cvtColor/inRange her karede yeni bellek ayırmaz.
+    """
+    return _detect_impl(frame, config['resize_width'], config['top_n_contours'],
+                        config['min_contour_area'], config['solidity'],
+                        _split_hue_bounds(config['hsv_lower'], config['hsv_upper']),
+                        buffers if buffers is not None else {})
+
+def _gps_core(dx, dy, half_w, half_h, fov_h, fov_v, yaw, cam_pitch_total, alt, lat, lon):
+    """Tek tespit için saf skaler GPS aritmetiği; numba varsa njit ile derlenir."""
+    angle_offset_yaw = (dx / half_w) * (fov_h / 2.0)
+    angle_offset_pitch = (dy / half_h) * (fov_v / 2.0)
+
+    total_target_yaw_deg = yaw + angle_offset_yaw
+    depression_angle_deg = -(cam_pitch_total + angle_offset_pitch)
+    if depression_angle_deg <= 1.0:
+        return 0.0, 0.0, False
+
+    ground_distance = alt / math.tan(math.radians(depression_angle_deg))
+
+    R = 6378137.0
+    dn = ground_distance * math.cos(math.radians(total_target_yaw_deg))
+    de = ground_distance * math.sin(math.radians(total_target_yaw_deg))
+
+    dLat = dn / R
+    dLon = de / (R * math.cos(math.radians(lat)))
+    return lat + math.degrees(dLat), lon + math.degrees(dLon), True
+
+if njit is not None:
+    _gps_core = njit(cache=True, fastmath=True)(_gps_core)
+
+# Bu sayıya kadar tespitte ufunc dispatch maliyeti baskın; skaler çekirdek kullan
+_SCALAR_BATCH_MAX = 4
+
+def calculate_target_gps_batch(frame_shape: tuple, detections: np.ndarray, telemetry: Dict[str, Any], config: Dict[str, Any]) -> np.ndarray:
+    """Tüm tespitlerin GPS koordinatlarını tek seferde, NumPy ile vektörel hesaplar.
+
+    Args:
+        detections: (N,2) piksel koordinat dizisi.
+
+    Returns:
+        (N,2) enlem/boylam dizisi; geçersiz satırlar (alçak irtifa, yetersiz
+        bakış açısı) NaN olarak işaretlenir.
+    """
+    result = np.full((len(detections), 2), np.nan)
     drone_alt = telemetry.get('alt', 0)
-    if drone_alt <= 0.5: return None
+    if drone_alt <= 0.5 or len(detections) == 0: return result
+
+    # Kare-geneli erken çıkış: kameranın en dik bakan pikseli bile ufka
+    # yakınsa hiçbir tespit geçerli izdüşüm veremez; trig hiç hesaplanmaz.
+    cam_pitch_total = telemetry.get('pitch', 0) + telemetry.get('camera_fixed_pitch', 0)
+    if -(cam_pitch_total - config['camera_fov_v'] / 2.0) <= 1.0: return result
 
     frame_height, frame_width = frame_shape[:2]
-    dx = target_pixel[0] - frame_width / 2
-    dy = frame_height / 2 - target_pixel[1]
+
+    if len(detections) <= _SCALAR_BATCH_MAX:
+        half_w, half_h = frame_width / 2.0, frame_height / 2.0
+        yaw = telemetry.get('yaw', 0)
+        lat, lon = telemetry.get('lat', 0), telemetry.get('lon', 0)
+        for i in range(len(detections)):
+            # float() dönüşümü şart: detections float32 ve numba argüman
+            # tipine göre özelleşir; float32 skalerler start()'taki float64
+            # ısınma derlemesini ıskalayıp ilk tespitte yeni JIT tetiklerdi.
+            new_lat, new_lon, ok = _gps_core(
+                float(detections[i, 0]) - half_w, half_h - float(detections[i, 1]),
+                half_w, half_h, config['camera_fov_h'], config['camera_fov_v'],
+                yaw, cam_pitch_total, drone_alt, lat, lon)
+            if ok:
+                result[i, 0] = new_lat
+                result[i, 1] = new_lon
+        return result
+
+    # Jeodezik aritmetik float64 ister (derecede ~1e-7 hassasiyet);
+    # float32 piksel koordinatları burada bir kez yükseltilir
+    dx = detections[:, 0].astype(np.float64) - frame_width / 2
+    dy = frame_height / 2 - detections[:, 1].astype(np.float64)
 
     angle_offset_yaw = (dx / (frame_width / 2)) * (config['camera_fov_h'] / 2)
     angle_offset_pitch = (dy / (frame_height / 2)) * (config['camera_fov_v'] / 2)
-    
+
     total_target_yaw_deg = telemetry.get('yaw', 0) + angle_offset_yaw
-    total_camera_pitch = telemetry.get('pitch', 0) + telemetry.get('camera_fixed_pitch', 0)
-    depression_angle_deg = -(total_camera_pitch + angle_offset_pitch)
+    depression_angle_deg = -(cam_pitch_total + angle_offset_pitch)
+
+    valid = depression_angle_deg > 1.0
+    if not valid.any(): return result
+
+    ground_distance = drone_alt / np.tan(np.radians(depression_angle_deg[valid]))
 
-    if depression_angle_deg <= 1.0: return None
-    
-    ground_distance = drone_alt / math.tan(math.radians(depression_angle_deg))
-    
     R = 6378137.0
-    dn = ground_distance * math.cos(math.radians(total_target_yaw_deg))
-    de = ground_distance * math.sin(math.radians(total_target_yaw_deg))
-    
-    current_lat_rad = math.radians(telemetry.get('lat', 0))
+    yaw_rad = np.radians(total_target_yaw_deg[valid])
+    dn = ground_distance * np.cos(yaw_rad)
+    de = ground_distance * np.sin(yaw_rad)
+
+    current_lat = telemetry.get('lat', 0)
+    current_lat_rad = math.radians(current_lat)
     dLat = dn / R
     dLon = de / (R * math.cos(current_lat_rad))
-    
-    new_lat = telemetry.get('lat', 0) + math.degrees(dLat)
-    new_lon = telemetry.get('lon', 0) + math.degrees(dLon)
-    
-    return (new_lat, new_lon)
+
+    result[valid, 0] = current_lat + np.degrees(dLat)
+    result[valid, 1] = telemetry.get('lon', 0) + np.degrees(dLon)
+
+    return result
 
 # --- Ana Operasyon Sınıfı ---
 class OperationColorTracker:
@@ -174,6 +415,9 @@ class OperationColorTracker:
         self.is_running = False
         self.thread: Optional[threading.Thread] = None
 
+        if _HAVE_OPENCL:
+            cv2.ocl.setUseOpenCL(True) # Tespit boru hattını T-API/OpenCL üzerinden çalıştır
+
         # Sunucudan gelen parametreleri ve operation_01.py'deki varsayılanları birleştir
         self.config = {
             'gstreamer_pipeline': params.get('gstreamer_pipeline', 0),
@@ -183,20 +427,28 @@ class OperationColorTracker:
             'top_n_contours': params.get('top_n_contours', 10),
             'min_contour_area': params.get('min_contour_area', 25),
             'solidity': params.get('solidity', 0.85), # YENİ: Solidity parametresi eklendi
-            'hsv_lower': np.array(params.get('hsv_lower_bound', [90, 50, 40])),
-            'hsv_upper': np.array(params.get('hsv_upper_bound', [115, 255, 255])),
+            'hsv_lower': np.ascontiguousarray(params.get('hsv_lower_bound', [90, 50, 40]), dtype=np.uint8),
+            'hsv_upper': np.ascontiguousarray(params.get('hsv_upper_bound', [115, 255, 255]), dtype=np.uint8),
             'confirmation_frames': params.get('confirmation_frames', 20),
             'pixel_threshold': params.get('pixel_threshold', 100),
             'unseen_threshold': params.get('unseen_threshold', 50),
         }
 
         self.target_manager = TargetManager(self.output_queue, self.config)
+        self._detect_buffers: Dict[str, Any] = {} # detect_all_color_targets ara tamponları (kareler arası yeniden kullanım)
+        self._latest_frame = deque(maxlen=1) # Tek slotlu SPSC tamponu: yakalayıcı yazar, işleyici en taze kareyi alır
+        self._detect = None # start() anında _make_detector ile kurulur
 
     def start(self) -> bool:
         """Operasyonu ayrı bir iş parçacığında (thread) başlatır."""
         if self.is_running:
             self.logger.warning("Color Tracker (Optimized) operation is already running.")
             return False
+        if njit is not None:
+            # JIT derlemesini ilk tespitten önce tetikle (ısınma çağrısı)
+            _gps_core(0.0, 0.0, 160.0, 120.0, 58.5, 58.5, 0.0, -45.0, 10.0, 0.0, 0.0)
+        # Tespitçiyi sabit config değerleriyle özelleştir (kare başına dict araması yok)
+        self._detect = _make_detector(self.config, self._detect_buffers)
         self.is_running = True
         self.thread = threading.Thread(target=self._run_loop, daemon=True)
         self.thread.start()
@@ -228,19 +480,35 @@ class OperationColorTracker:
             return
 
         self.logger.info(f"Görüntü akışı başlatıldı: {video_source}")
+
+        # Kare yakalama ayrı thread'de: yavaş bir grab, tespiti bloklamaz ve
+        # işleyici her zaman en taze kare üzerinde çalışır.
+        grab_thread = threading.Thread(target=self._grab_loop, args=(cap,), daemon=True)
+        grab_thread.start()
+
         while self.is_running:
-            ret, frame = cap.read()
-            if not ret:
-                time.sleep(0.1)
+            try:
+                frame = self._latest_frame.pop()
+            except IndexError:
+                time.sleep(0.005)
                 continue
-            
+
+            # Telemetri ile config artık birleştirilmiyor: GPS hesabı config'i
+            # zaten ayrı parametre olarak alır, kare başına dict kopyası yapılmaz.
             mav_telemetry = self.mav_handler.get_telemetry_snapshot()
-            mav_telemetry.update(self.config)
 
-            detections = detect_all_color_targets(frame, self.config)
+            detections = self._detect(frame)
             self.target_manager.update(detections, mav_telemetry, frame.shape)
-            
-            time.sleep(0.02)
 
+        grab_thread.join(timeout=2.0)
         cap.release()
         self.logger.info("Görüntü yakalama serbest bırakıldı.")
+
+    def _grab_loop(self, cap):
+        """Kamerayı sürekli okur; maxlen=1 deque eski kareyi otomatik düşürür."""
+        while self.is_running:
+            ret, frame = cap.read()
+            if not ret:
+                time.sleep(0.1)
+                continue
+            self._latest_frame.append(frame)
@@ -1,5 +1,6 @@
 # Bu dosya, projenizin ana dizininde 'operations' adlı klasör içinde yer almalıdır.
 
+import re
 import serial
 import threading
 import time
@@ -12,6 +13,16 @@ class OperationSerialListener:
     Listens to a specified serial port for incoming data, parses it,
     and puts it into a queue for the main application to process and send to the server.
     """
+
+    # Önceden derlenmiş anahtar/değer deseni: ayrıştırma C'de tek geçişte çalışır,
+    # satır başına split listeleri ayrılmaz. Hem ':' hem '=' ayırıcısını kabul eder
+    # (eski kod ikisi arasında tutarsızdı).
+    _KV_RE = re.compile(rb'([A-Za-z_]\w*)\s*[:=]\s*([^,\r\n]+)')
+
+    # Satırsız biriken veri için üst sınır: geçerli hiçbir satır bu kadar uzun
+    # olamaz; yanlış baud hızından gelen ikili çöp tamponu sınırsız büyütmesin.
+    _MAX_PENDING_BYTES = 4096
+
     def __init__(self,
                  mav_handler, # Not: Bu operasyon MAVLink'i kullanmaz, ancak standart yapı için parametre olarak alınır.
                  output_queue: Queue,
@@ -70,10 +81,10 @@ class OperationSerialListener:
             self.serial_connection.close()
             self.logger.info(f"Seri port kapatıldı: {self.port_name}")
 
-    def _parse_line(self, line: str) -> Optional[Dict[str, Any]]:
+    def _parse_line(self, line: bytes) -> Optional[Dict[str, Any]]:
         """
         Gelen seri port satırını ayrıştırır.
-        Beklenen format: "key1=value1,key2=value2,..."
+        Beklenen format: "key1=value1,key2=value2,..." (':' ayırıcısı da kabul edilir)
         Örnek: "type=target,id=a1b2,lat=40.123,lon=29.456"
         """
         line = line.strip()
@@ -81,16 +92,14 @@ class OperationSerialListener:
             return None
 
         try:
-            data_dict = {}
-            pairs = line.split(',')
-            for pair in pairs:
-                if ':' in pair:
-                    key, value = pair.split(':', 1)
-                    data_dict[key.strip()] = value.strip()
+            # findall tüm çiftleri tek C geçişinde çıkarır; split(',')+split(':')
+            # ara listeleri oluşturulmaz
+            data_dict = {k.decode('utf-8'): v.decode('utf-8').strip()
+                         for k, v in self._KV_RE.findall(line)}
 
             # Temel doğrulama: 'type' anahtarı zorunlu
             if "type" not in data_dict:
-                self.logger.warning(f"Geçersiz seri veri alındı ('type' anahtarı eksik): {line}")
+                self.logger.warning(f"Geçersiz seri veri alındı ('type' anahtarı eksik): {line!r}")
                 return None
 
             # Bilinen alanlar için tip dönüşümü
@@ -100,25 +109,37 @@ class OperationSerialListener:
             return data_dict
 
         except (ValueError, IndexError) as e:
-            self.logger.error(f"Seri port satırı ayrıştırılamadı: '{line}'. Hata: {e}")
+            self.logger.error(f"Seri port satırı ayrıştırılamadı: {line!r}. Hata: {e}")
             return None
 
     def _run_loop(self):
         """Continuously reads from the serial port in a background thread."""
         self.logger.info(f"Seri porttan veri bekleniyor: {self.port_name}...")
+        buf = b''
         while self.is_running:
             if not self.serial_connection or not self.serial_connection.is_open:
                 self.logger.error(f"Seri port bağlantısı koptu. Operasyon durduruluyor.")
                 break
 
             try:
-                # readline() metodu, yeni bir satır gelene veya timeout süresi dolana kadar bekler.
-                line_bytes = self.serial_connection.readline()
-                if line_bytes:
-                    line_str = line_bytes.decode('utf-8').strip()
-                    self.logger.debug(f"Seri porttan alındı: {line_str}")
-
-                    parsed_data = self._parse_line(line_str)
+                # Bekleyen tüm baytları tek read() çağrısıyla boşalt: yoğun
+                # trafikte bir uyanışta birden çok satır işlenir. Veri yoksa
+                # read(1) timeout süresine kadar bloklar (meşgul bekleme olmaz).
+                waiting = self.serial_connection.in_waiting
+                data = self.serial_connection.read(waiting or 1)
+                if not data:
+                    continue
+                buf += data
+
+                while b'\n' in buf:
+                    line_bytes, buf = buf.split(b'\n', 1)
+                    if not line_bytes:
+                        continue
+                    self.logger.debug("Seri porttan alındı: %r", line_bytes)
+
+                    # Ayrıştırma bytes üzerinde yapılır; decode yalnızca
+                    # eşleşen anahtar/değer parçaları için çalışır
+                    parsed_data = self._parse_line(line_bytes)
                     if parsed_data:
                         # Veriyi standart bir formatta kuyruğa koy
                         report = {
@@ -130,6 +151,12 @@ class OperationSerialListener:
                         }
                         self.output_queue.put(report)
 
+                # Kalan parça satır sonu görmeden büyümeye devam ediyorsa at;
+                # eski readline() davranışı da bu durumda belleği sınırlıyordu.
+                if len(buf) > self._MAX_PENDING_BYTES:
+                    self.logger.warning("Seri tamponda %d bayt satırsız veri birikti; atılıyor.", len(buf))
+                    buf = b''
+
             except serial.SerialException as e:
                 self.logger.error(f"Seri port hatası: {e}. Operasyon durduruluyor.")
                 break # Döngüden çıkarak thread'in sonlanmasını sağla
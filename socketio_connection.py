@@ -1,14 +1,84 @@
 import socketio
 import logging
 import time
+from functools import partial
 from typing import Callable, Optional, List, Dict, Any
 
+# Module-level bound clock: immune to NTP step adjustments and avoids the
+# double attribute lookup on every connection check.
+_monotonic = time.monotonic
+
+try:
+    import orjson
+
+    class _OrjsonAdapter:
+        """json-module-style dumps/loads backed by orjson for faster flushes."""
+        @staticmethod
+        def dumps(obj, **kwargs):
+            return orjson.dumps(obj).decode()
+
+        @staticmethod
+        def loads(s, **kwargs):
+            return orjson.loads(s)
+
+    _JSON_IMPL = _OrjsonAdapter
+
+except ImportError:
+    _JSON_IMPL = None # socketio falls back to the stdlib json module
+
 class SocketIOConnection:
     """
     Manages Socket.IO client connection, event handling, and message flushing.
     Includes persistent disconnect checks, and handlers for commands, missions, and operations.
     """
 
+    # Dispatch table for the request_* events. All five handlers share the
+    # same scaffolding (id/items extraction, missing-handler checks, error
+    # responses); only these per-event facts differ. Styles: 'bool' passes
+    # items and expects True/False, 'list' takes no arguments and returns the
+    # mission items, 'dict' passes items and returns the response dict itself.
+    _ROUTES: Dict[str, Dict[str, Any]] = {
+        'request_command': {
+            'response': 'response_command',
+            'handler_attr': 'handler_command',
+            'needs_items': True,
+            'style': 'bool',
+            'not_configured': 'Bridge command handler not configured',
+            'failed': 'Command processing failed on bridge/vehicle',
+        },
+        'request_mission_download': {
+            'response': 'response_mission_download',
+            'handler_attr': 'handler_mission_download',
+            'needs_items': False,
+            'style': 'list',
+            'not_configured': 'Bridge download handler not configured',
+            'failed': 'Mission download failed on bridge/vehicle',
+        },
+        'request_mission_upload': {
+            'response': 'response_mission_upload',
+            'handler_attr': 'handler_mission_upload',
+            'needs_items': True,
+            'wants_list': True,
+            'style': 'bool',
+            'not_configured': 'Bridge upload handler not configured',
+            'failed': 'Mission upload failed on bridge/vehicle',
+        },
+        'request_start_operation': {
+            'response': 'response_start_operation',
+            'handler_attr': 'handler_start_operation',
+            'needs_items': True,
+            'style': 'dict',
+            'not_configured': 'Bridge start_operation handler not configured',
+        },
+        'request_stop_operation': {
+            'response': 'response_stop_operation',
+            'handler_attr': 'handler_stop_operation',
+            'needs_items': True,
+            'style': 'dict',
+            'not_configured': 'Bridge stop_operation handler not configured',
+        },
+    }
+
     def __init__(self,
                 server_url: str,
                 handler_command: Optional[Callable[[Dict[str, Any]], bool]] = None,
@@ -43,14 +113,22 @@ class SocketIOConnection:
 
         self._check_interval = check_interval
         self._max_disconnect_time = max_disconnect_time
-        self._last_check_time = time.time()
-        self._disconnect_duration = 0.0
+        self._last_check_time = _monotonic() # Throttles the still-disconnected warning
+        self._disconnect_start: Optional[float] = None # Set by _on_disconnect, cleared by _on_connect
+        self._emit: Optional[Callable] = None # Bound client.emit while connected; doubles as the connected flag
 
+        # The client doubles reconnection_delay per attempt up to the max and
+        # spreads retries by +/- randomization_factor, so a fleet of bridges
+        # recovering from the same outage does not reconnect in lockstep. The
+        # cap stays below max_disconnect_time so retries keep firing while the
+        # persistent-disconnect watchdog is still counting.
         self.client = socketio.Client(
             reconnection=True,
             reconnection_attempts=10,
-            reconnection_delay=1,
-            reconnection_delay_max=5
+            reconnection_delay=0.5,
+            reconnection_delay_max=15,
+            randomization_factor=0.3,
+            json=_JSON_IMPL
         )
         self._register_handlers()
 
@@ -58,14 +136,14 @@ class SocketIOConnection:
     def connect(self) -> bool:
         """Establishes the initial connection to the Socket.IO server."""
         try:
-            self.logger.info(f"Attempting Socket.IO connection to {self.server_url}...")
+            self.logger.info("Attempting Socket.IO connection to %s...", self.server_url)
             self.client.connect(self.server_url, wait_timeout=10)
             return True
         except socketio.exceptions.ConnectionError as e:
-            self.logger.error(f"Socket.IO connection failed: {str(e)}")
+            self.logger.error("Socket.IO connection failed: %s", e)
             return False
         except Exception as e:
-            self.logger.error(f"Unexpected error during Socket.IO connection: {str(e)}", exc_info=True)
+            self.logger.error("Unexpected error during Socket.IO connection: %s", e, exc_info=True)
             return False
 
     def disconnect(self) -> bool:
@@ -78,268 +156,206 @@ class SocketIOConnection:
                 return True
             return False
         except Exception as e:
-            self.logger.error(f"Error during Socket.IO disconnect: {str(e)}", exc_info=True)
+            self.logger.error("Error during Socket.IO disconnect: %s", e, exc_info=True)
             return False
 
     def check_persistent_disconnect(self) -> bool:
-        """Checks if the client has been disconnected longer than the threshold."""
-        current_time = time.time()
-        if current_time - self._last_check_time > self._check_interval:
-            if not self.client.connected:
-                self._disconnect_duration += (current_time - self._last_check_time)
-                self.logger.warning(f"Socket.IO still disconnected. Accumulated duration: {self._disconnect_duration:.1f}s / {self._max_disconnect_time}s")
-                if self._disconnect_duration >= self._max_disconnect_time:
-                    self.logger.critical(f"Socket.IO disconnected threshold ({self._max_disconnect_time}s) exceeded.")
-                    return False
-            else:
-                if self._disconnect_duration > 0: self.logger.info("Socket.IO connection re-established.")
-                self._disconnect_duration = 0
-            self._last_check_time = current_time
+        """Checks if the client has been disconnected longer than the threshold.
+
+        The outage start is stamped by the disconnect callback at the moment
+        of the transition, so the duration is exact regardless of how often
+        the caller polls; this method is just a cheap read of that timestamp.
+        """
+        start = self._disconnect_start
+        if start is None or self.client.connected: return True
+
+        now = _monotonic()
+        duration = now - start
+        if duration >= self._max_disconnect_time:
+            self.logger.critical("Socket.IO disconnected threshold (%ss) exceeded.", self._max_disconnect_time)
+            return False
+
+        if now - self._last_check_time > self._check_interval:
+            self._last_check_time = now
+            self.logger.warning("Socket.IO still disconnected. Duration: %.1fs / %ss", duration, self._max_disconnect_time)
         return True
 
     # --- Event Handling ---
     def _register_handlers(self):
         """Registers essential Socket.IO event handlers."""
-        self.client.on('connect', self._on_connect)
-        self.client.on('disconnect', self._on_disconnect)
-        self.client.on('connect_error', self._on_connect_error)
-
-        if self.handler_command: self.client.on('request_command', self._on_request_command)
-        if self.handler_mission_download: self.client.on('request_mission_download', self._on_request_mission_download)
-        if self.handler_mission_upload: self.client.on('request_mission_upload', self._on_request_mission_upload)
-        if self.handler_start_operation: self.client.on('request_start_operation', self._on_request_start_operation)
-        if self.handler_stop_operation: self.client.on('request_stop_operation', self._on_request_stop_operation)
+        # Built as one dict and installed with a single update rather than
+        # eight client.on calls; registrations survive reconnects, so this
+        # runs once per client lifetime.
+        handlers = {
+            'connect': self._on_connect,
+            'disconnect': self._on_disconnect,
+            'connect_error': self._on_connect_error,
+        }
+        for event_name, route in self._ROUTES.items():
+            if getattr(self, route['handler_attr']):
+                handlers[event_name] = partial(self._dispatch, event_name)
+        self.client.handlers.setdefault('/', {}).update(handlers)
         self.logger.info("Socket.IO event handlers registered.")
 
     def _unregister_handlers(self):
         """Unregisters event handlers upon disconnection."""
-        events = ['connect', 'disconnect', 'connect_error', 'request_command', 
-                  'request_mission_download', 'request_mission_upload',
-                  'request_start_operation', 'request_stop_operation']
+        # Membership test instead of try/except: raising KeyError per absent
+        # event costs far more than a dict lookup.
+        registered = self.client.handlers.get('/', {})
+        events = ['connect', 'disconnect', 'connect_error'] + list(self._ROUTES)
         for event in events:
-            try:
+            if event in registered:
                 self.client.off(event)
-            except KeyError: pass
         self.logger.info("Socket.IO event handlers unregistered.")
 
     def _on_connect(self):
         """Callback for successful connection."""
-        self.logger.info(f"Socket.IO connected to {self.server_url} (SID: {self.client.sid})")
-        self._disconnect_duration = 0.0
-        self._last_check_time = time.time()
+        self.logger.info("Socket.IO connected to %s (SID: %s)", self.server_url, self.client.sid)
+        if self._disconnect_start is not None:
+            self.logger.info("Socket.IO connection re-established after %.1fs.", _monotonic() - self._disconnect_start)
+        self._disconnect_start = None
+        self._last_check_time = _monotonic()
+        self._emit = self.client.emit
 
     def _on_disconnect(self):
         """Callback for disconnection."""
+        self._emit = None
+        if self._disconnect_start is None:
+            self._disconnect_start = _monotonic()
         self.logger.warning("Socket.IO disconnected. Attempting automatic reconnection...")
 
     def _on_connect_error(self, data):
         """Callback for connection errors during initial connection attempts."""
-        self.logger.error(f"Socket.IO connection attempt failed: {data or 'No details provided'}")
+        self.logger.error("Socket.IO connection attempt failed: %s", data or 'No details provided')
 
-    def emit_status(self, event_name: str, status_dict: Dict[str, Any]):
-        """Public helper method to emit status updates, checking connection and handling errors."""
-        if not self.client.connected:
-            self.logger.warning(f"Cannot emit status '{event_name}': Socket.IO not connected. Status: {status_dict}")
+    def emit_status(self, event_name: str, payload: Dict[str, Any]):
+        """Public helper method to emit an event, checking connection and handling errors."""
+        emit = self._emit
+        if emit is None:
+            self.logger.warning("Cannot emit '%s': Socket.IO not connected. Payload: %s", event_name, payload)
             return
-        
-        try:
-            self.logger.info(f"Emitting status '{event_name}': {status_dict}")
-            self.client.emit(event_name, status_dict)
-        
-        except Exception as e:
-            self.logger.error(f"Failed to emit status '{event_name}': {e}", exc_info=True)
 
-    def emit_response(self, event_name: str, response_dict: Dict[str, Any]):
-        """Public helper method to emit status updates, checking connection and handling errors."""
-        if not self.client.connected:
-            self.logger.warning(f"Cannot emit status '{event_name}': Socket.IO not connected. Status: {response_dict}")
-            return
-        
         try:
-            self.logger.info(f"Emitting status '{event_name}': {response_dict}")
-            self.client.emit(event_name, response_dict)
-        
-        except Exception as e:
-            self.logger.error(f"Failed to emit status '{event_name}': {e}", exc_info=True)
+            self.logger.info("Emitting '%s': %s", event_name, payload)
+            emit(event_name, payload)
 
-    def _on_request_command(self, data):
-        """Handles 'request_command' event from the server."""
-        event_name = 'response_command'
-        event_id = data.get('id','None')
-        event_data = data.get('items', None)
-        
-        if not event_data:
-            self.logger.warning("Received 'request_command' but no have 'items'.")
-            self.emit_response(event_name, {'success': False, 'id': event_id, 'error': 'Request does not have items'})
-            return
-        
-        elif not self.handler_command:
-            self.logger.warning("Received 'request_command' but no handler_command configured.")
-            self.emit_response(event_name, {'success': False, 'id': event_id, 'error': 'Bridge command handler not configured'})
-            return
-        
-        try:
-            if self.handler_command(event_data): self.emit_response(event_name, {'success': True, 'id': event_id})
-            else: self.emit_response(event_name, {'success': False, 'id': event_id, 'error': 'Command processing failed on bridge/vehicle'})
-        
+        except socketio.exceptions.SocketIOError as e:
+            # Known transient client-side failure (e.g. racing a disconnect):
+            # skip the traceback capture, the message says everything needed.
+            self.logger.warning("Emit of '%s' failed (transient): %s", event_name, e)
         except Exception as e:
-            self.logger.error(f"Error occurred during command request processing: {str(e)}", exc_info=True)
-            self.emit_response(event_name, {'success': False, 'id': event_id, 'error': f'Internal bridge error: {str(e)}'})
+            self.logger.error("Failed to emit '%s': %s", event_name, e, exc_info=True)
 
-    def _on_request_mission_download(self, data):
-        """Handles 'request_mission_download' event from the server."""
-        event_name = 'response_mission_download'
-        event_id = data.get('id','None')
-        
-        if not self.handler_mission_download:
-            self.logger.warning("Received 'request_mission_download' but no handler configured.")
-            self.emit_response(event_name, {'success': False, 'id': event_id, 'error': 'Bridge download handler not configured'})
-            return
-        
-        try:
-            mission_list = self.handler_mission_download()
-            if mission_list: self.emit_response(event_name, {'success': True, 'id': event_id, 'items': mission_list})
-            else: self.emit_response(event_name, {'success': False, 'id': event_id, 'error': 'Mission download failed on bridge/vehicle'})
-        
-        except Exception as e:
-            self.logger.error(f"Error occurred during mission download request: {str(e)}", exc_info=True)
-            self.emit_response(event_name, {'success': False, 'id': event_id, 'error': f'Internal bridge error: {str(e)}'})
+    # emit_status and emit_response were byte-for-byte duplicates; both names
+    # stay public but share one implementation.
+    emit_response = emit_status
 
-    def _on_request_mission_upload(self, data):
-        """Handles 'request_mission_upload' event from the server."""
-        event_name = 'response_mission_upload'
+    def _dispatch(self, event_name, data):
+        """Handles any request_* event; per-event behavior comes from _ROUTES."""
+        route = self._ROUTES[event_name]
+        response_event = route['response']
         event_id = data.get('id','None')
         event_data = data.get('items', None)
-        
-        if not event_data:
-            self.logger.warning("Received 'request_mission_upload' but no have 'items'.")
-            self.emit_response(event_name, {'success': False, 'id': event_id, 'error': 'Request does not have items'})
-            return
-        
-        elif not self.handler_mission_upload:
-            self.logger.warning("Received 'request_mission_upload' but no handler configured.")
-            self.emit_response(event_name, {'success': False, 'id': event_id, 'error': 'Bridge upload handler not configured'})
-            return
-        
-        elif not isinstance(event_data, list):
-            self.emit_response(event_name, {'success': False, 'id': event_id, 'error': f'Invalid data format: Expected list'})
-            return
-        
-        try:
-            if self.handler_mission_upload(event_data): self.emit_response(event_name, {'success': True, 'id': event_id})
-            else: self.emit_response(event_name, {'success': False, 'id': event_id, 'error': 'Mission upload failed on bridge/vehicle'})
-        
-        except Exception as e:
-            self.logger.error(f"Error occurred during mission upload request: {str(e)}", exc_info=True)
-            self.emit_response(event_name, {'success': False, 'id': event_id, 'error': f'Internal bridge error: {str(e)}'})
 
-    def _on_request_start_operation(self, data):
-        """Handles 'request_start_operation' event from the server."""
-        event_name = 'response_start_operation'
-        event_id = data.get('id','None')
-        event_data = data.get('items', None)
-        
-        if not event_data:
-            self.logger.warning("Received 'request_start_operation' but no have 'items'.")
-            self.emit_response(event_name, {'success': False, 'id': event_id, 'error': 'Request does not have items'})
-            return
-        
-        if not self.handler_start_operation:
-            self.logger.warning("Received 'request_start_operation' but no handler configured.")
-            self.emit_response(event_name, {'success': False, 'id': event_id, 'error': 'Bridge start_operation handler not configured'})
+        if route['needs_items'] and not event_data:
+            self.logger.warning("Received '%s' but no have 'items'.", event_name)
+            self.emit_response(response_event, {'success': False, 'id': event_id, 'error': 'Request does not have items'})
             return
-        
-        try:
-            response_dict = self.handler_start_operation(event_data)
-            response_dict['id'] = event_id
-            if isinstance(response_dict, dict): self.emit_response(event_name, response_dict)
-            else: self.logger.error("Operation start handler did not return a dictionary.")
-        
-        except Exception as e:
-            self.logger.error(f"Error during start_operation request processing: {e}", exc_info=True)
-            self.emit_response(event_name, {'success': False, 'id': event_id, 'error': f'Internal bridge error: {e}'})
 
-    def _on_request_stop_operation(self, data):
-        """Handles 'request_stop_operation' event from the server."""
-        event_name = 'response_stop_operation'
-        event_id = data.get('id','None')
-        event_data = data.get('items', None)
-        
-        if not event_data:
-            self.logger.warning("Received 'request_stop_operation' but no have 'items'.")
-            self.emit_response(event_name, {'success': False, 'id': event_id, 'error': 'Request does not have items'})
+        handler = getattr(self, route['handler_attr'])
+        if not handler:
+            self.logger.warning("Received '%s' but no handler configured.", event_name)
+            self.emit_response(response_event, {'success': False, 'id': event_id, 'error': route['not_configured']})
             return
-        
-        if not self.handler_stop_operation:
-            self.logger.warning("Received 'request_stop_operation' but no handler configured.")
-            self.emit_response(event_name, {'success': False, 'id': event_id, 'error': 'Bridge stop_operation handler not configured'})
+
+        if route.get('wants_list') and not isinstance(event_data, list):
+            self.emit_response(response_event, {'success': False, 'id': event_id, 'error': 'Invalid data format: Expected list'})
             return
-        
+
         try:
-            response_dict = self.handler_stop_operation(event_data)
-            response_dict['id'] = event_id
-            if isinstance(response_dict, dict): self.emit_response(event_name, response_dict)
-            else: self.logger.error("Operation stop handler did not return a dictionary.")
-        
+            style = route['style']
+            if style == 'dict':
+                response_dict = handler(event_data)
+                if isinstance(response_dict, dict):
+                    response_dict['id'] = event_id
+                    self.emit_response(response_event, response_dict)
+                else: self.logger.error("'%s' handler did not return a dictionary.", event_name)
+            else:
+                result = handler() if style == 'list' else handler(event_data)
+                if result:
+                    response = {'success': True, 'id': event_id}
+                    if style == 'list': response['items'] = result
+                    self.emit_response(response_event, response)
+                else:
+                    self.emit_response(response_event, {'success': False, 'id': event_id, 'error': route['failed']})
+
         except Exception as e:
-            self.logger.error(f"Error during stop_operation request processing: {e}", exc_info=True)
-            self.emit_response(event_name, {'success': False, 'id': event_id, 'error': f'Internal bridge error: {e}'})
+            self.logger.error("Error during '%s' request processing: %s", event_name, e, exc_info=True)
+            self.emit_response(response_event, {'success': False, 'id': event_id, 'error': f'Internal bridge error: {e}'})
 
     # --- Buffer Flushing ---
     def flush_buffer(self, buffer_manager) -> bool:
-        """Emits buffered messages to the server via 'mavlink_message'."""
-        if buffer_manager.is_empty() or not self.client.connected: return True
+        """
+        Emits buffered messages to the server via 'mavlink_message'.
+
+        The whole batch goes out as a single emit (one write + one frame)
+        rather than one event per message; the server iterates the list.
+        """
+        emit = self._emit
+        if buffer_manager.is_empty() or emit is None: return True
         try:
-            buffer_content = buffer_manager.get_buffer_content()
-            self.client.emit('mavlink_message', buffer_content)
-            self.logger.info(f"Flushed {len(buffer_content)} MAVLink messages.")
-            buffer_manager.clear_buffer()
+            # Swap the buffer out first so the producer can keep appending
+            # while this batch is serialized and sent.
+            buffer_content = buffer_manager.swap_out()
+            try:
+                emit('mavlink_message', list(buffer_content))
+                self.logger.info("Flushed %d MAVLink messages.", len(buffer_content))
+            finally:
+                buffer_manager.recycle(buffer_content)
             return True
-        
+
+        except socketio.exceptions.SocketIOError as e:
+            self.logger.warning("Flush emit failed (transient): %s", e)
+            return False
         except Exception as e:
-            self.logger.error(f"Socket.IO emit error during flush: {e}", exc_info=True)
+            self.logger.error("Socket.IO emit error during flush: %s", e, exc_info=True)
             return False
 
     # --- Handler Setters ---
-    def _update_handler(self, event_name: str, new_handler: Optional[Callable], internal_handler: Callable):
+    def _update_handler(self, event_name: str, new_handler: Optional[Callable]):
         """Generic helper to update a handler and re-bind the event."""
-        try: self.client.off(event_name)
-        except KeyError: pass
-        
-        attr_name = f"handler_{event_name.replace('request_', '')}"
-        setattr(self, attr_name, new_handler)
-        
+        handler_attr = self._ROUTES[event_name]['handler_attr']
+        if new_handler is getattr(self, handler_attr): return # Unchanged: skip the off/on churn
+
+        if event_name in self.client.handlers.get('/', {}):
+            self.client.off(event_name)
+
+        setattr(self, handler_attr, new_handler)
+
         if new_handler:
-            self.client.on(event_name, internal_handler)
-            self.logger.info(f"Updated '{event_name}' handler.")
-        
+            self.client.on(event_name, partial(self._dispatch, event_name))
+            self.logger.info("Updated '%s' handler.", event_name)
+
         else:
-            self.logger.info(f"Removed '{event_name}' handler.")
-
-    def set_handler_command(self, handler: Optional[Callable]):
-        """Updates the handler for 'request_command' events."""
-        self._update_handler('request_command', handler, self._on_request_command)
-
-    def set_handler_mission_download(self, handler: Optional[Callable]):
-        """Updates the handler for 'request_mission_download' events."""
-        self._update_handler('request_mission_download', handler, self._on_request_mission_download)
-
-    def set_handler_mission_upload(self, handler: Optional[Callable]):
-        """Updates the handler for 'request_mission_upload' events."""
-        self._update_handler('request_mission_upload', handler, self._on_request_mission_upload)
-
-    def set_handler_start_operation(self, handler: Optional[Callable]):
-        """Updates the handler for 'request_start_operation' events."""
-        self._update_handler('request_start_operation', handler, self._on_request_start_operation)
-
-    def set_handler_stop_operation(self, handler: Optional[Callable]):
-        """Updates the handler for 'request_stop_operation' events."""
-        self._update_handler('request_stop_operation', handler, self._on_request_stop_operation)
-
-    def set_handlers(self, command=None, mission_download=None, mission_upload=None, start_operation=None, stop_operation=None):
-        """Convenience method to set multiple handlers at once."""
-        if command is not None: self.set_handler_command(command)
-        if mission_download is not None: self.set_handler_mission_download(mission_download)
-        if mission_upload is not None: self.set_handler_mission_upload(mission_upload)
-        if start_operation is not None: self.set_handler_start_operation(start_operation)
-        if stop_operation is not None: self.set_handler_stop_operation(stop_operation)
+            self.logger.info("Removed '%s' handler.", event_name)
+
+    # Short handler names accepted by set_handlers, mapped to their events.
+    _HANDLER_EVENTS = {
+        'command': 'request_command',
+        'mission_download': 'request_mission_download',
+        'mission_upload': 'request_mission_upload',
+        'start_operation': 'request_start_operation',
+        'stop_operation': 'request_stop_operation',
+    }
+
+    def set_handlers(self, **handlers):
+        """
+        Updates any subset of request handlers by keyword, e.g.
+        set_handlers(command=fn, stop_operation=other_fn).
+
+        Accepted names: command, mission_download, mission_upload,
+        start_operation, stop_operation. Passing None for a name removes
+        that handler; omitted names are left unchanged.
+        """
+        for name, handler in handlers.items():
+            self._update_handler(self._HANDLER_EVENTS[name], handler)